@@ -2,10 +2,276 @@
 Discord Webhook Integration Module
 Sends notifications about bingo tile completions and item drops
 """
+import asyncio
+import collections
+import queue
+import random
+import threading
+import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+
+# Deliveries are handed to a background worker so request handlers never
+# wait on Discord's round-trip. One shared session keeps the TLS connection
+# to discord.com alive between messages.
+_queue = queue.Queue(maxsize=10000)
+_session = requests.Session()
+# Retries are handled in _deliver, so the adapter itself never retries
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+_worker = None
+_worker_lock = threading.Lock()
+
+# Embeds bound for the same webhook are coalesced into one POST. Discord
+# accepts up to 10 embeds per message; a batch is flushed when it is full
+# or when its oldest embed has waited BATCH_INTERVAL seconds. The embeds
+# of one message may also total at most MAX_EMBED_CHARS characters.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS = 6000
+BATCH_INTERVAL = 0.25
+
+# Failed deliveries are retried on 429, 5xx and network errors with
+# exponential backoff and jitter; other 4xx responses are permanent.
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# Discord reports which rate-limit bucket each webhook falls into via
+# X-RateLimit-Bucket. Tracking the bucket's remaining requests and reset
+# time lets us wait out an exhausted bucket instead of taking a 429.
+# bucket id -> {'remaining': int, 'reset': monotonic time}
+_buckets = {}
+# url -> bucket id, learned from responses
+_url_buckets = {}
+
+# Messages that could not be delivered, kept for inspection
+_dead_letters = collections.deque(maxlen=1000)
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff delay with jitter for a retry attempt"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random() * 0.5)
+
+
+def _retry_after(response: requests.Response) -> float:
+    """Seconds Discord asked us to wait after a 429"""
+    for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+        try:
+            return float(response.headers[header])
+        except (KeyError, ValueError):
+            continue
+    return 1.0
+
+
+def _wait_for_rate_limit(url: str):
+    """Sleep until the webhook's rate-limit bucket resets, if exhausted"""
+    bucket = _buckets.get(_url_buckets.get(url))
+    if not bucket:
+        return
+    
+    if bucket['remaining'] <= 0:
+        delay = bucket['reset'] - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    bucket['remaining'] -= 1
+
+
+def _update_rate_limit(url: str, response: requests.Response):
+    """Record rate-limit state reported by Discord for a webhook"""
+    bucket_id = response.headers.get('X-RateLimit-Bucket', url)
+    try:
+        _buckets[bucket_id] = {
+            'remaining': int(response.headers['X-RateLimit-Remaining']),
+            'reset': time.monotonic() + float(response.headers['X-RateLimit-Reset-After'])
+        }
+    except (KeyError, ValueError):
+        return
+    _url_buckets[url] = bucket_id
+
+
+def _dead_letter(url: str, payload: Dict, reason: str):
+    """Keep an undeliverable message for later inspection"""
+    print(f"Discord webhook delivery failed: {reason}")
+    _dead_letters.append({
+        'url': url,
+        'payload': payload,
+        'reason': reason,
+        'failedAt': datetime.utcnow().isoformat()
+    })
+
+
+def get_dead_letters() -> List[Dict]:
+    """Messages that exhausted their retries or were rejected by Discord"""
+    return list(_dead_letters)
+
+
+def _send(url: str, payload: Dict, max_attempts: int = MAX_ATTEMPTS) -> Tuple[bool, Optional[str]]:
+    """POST a payload to a webhook URL, retrying transient failures
+    
+    Returns:
+        (rejected, reason): reason is None if Discord accepted the message,
+        otherwise why it failed; rejected is True if Discord refused the
+        payload itself, so sending it again would not help
+    """
+    try:
+        body = orjson.dumps(payload)
+    except TypeError as e:
+        # orjson.JSONEncodeError, e.g. an int beyond 64 bits in an embed
+        return True, f"Could not encode payload: {e}"
+    
+    for attempt in range(max_attempts):
+        _wait_for_rate_limit(url)
+        
+        try:
+            response = _session.post(
+                url,
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                timeout=10
+            )
+        except requests.RequestException as e:
+            print(f"Error sending Discord webhook: {e}")
+            delay = _backoff(attempt)
+        else:
+            _update_rate_limit(url, response)
+            if response.status_code in [200, 204]:
+                return False, None
+            if response.status_code == 429:
+                delay = _retry_after(response) + random.random() * 0.1
+            elif response.status_code >= 500:
+                delay = _backoff(attempt)
+            else:
+                return True, f"Rejected with status {response.status_code}"
+        
+        if attempt < max_attempts - 1:
+            time.sleep(delay)
+    
+    return False, f"Gave up after {max_attempts} attempt(s)"
+
+
+def _deliver(url: str, payload: Dict) -> bool:
+    """POST a payload to a webhook URL, dead-lettering it if that fails
+    
+    Returns:
+        bool: True if Discord accepted the message
+    """
+    _, reason = _send(url, payload)
+    if reason:
+        _dead_letter(url, payload, reason)
+        return False
+    return True
+
+
+def _embed_chars(embed: Dict) -> int:
+    """Characters of an embed that count toward Discord's per-message total"""
+    total = len(str(embed.get('title', ''))) + len(str(embed.get('description', '')))
+    total += len(str(embed.get('footer', {}).get('text', '')))
+    total += len(str(embed.get('author', {}).get('name', '')))
+    for field in embed.get('fields', ()):
+        total += len(str(field.get('name', ''))) + len(str(field.get('value', '')))
+    return total
+
+
+def _embed_batches(embeds: List[Dict]):
+    """Split embeds into messages within Discord's count and size limits"""
+    batch, chars = [], 0
+    for embed in embeds:
+        size = _embed_chars(embed)
+        if batch and (len(batch) >= MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS):
+            yield batch
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += size
+    if batch:
+        yield batch
+
+
+def _flush(url: str, embeds: List[Dict]):
+    """Deliver buffered embeds in as few messages as Discord allows"""
+    for batch in _embed_batches(embeds):
+        payload = {'embeds': batch}
+        rejected, reason = _send(url, payload)
+        if not reason:
+            continue
+        
+        if rejected and len(batch) > 1:
+            # One bad embed fails the whole message; send them one at a
+            # time so only the bad one is lost
+            for embed in batch:
+                _deliver(url, {'embeds': [embed]})
+        else:
+            _dead_letter(url, payload, reason)
+
+
+def _run_worker():
+    """Deliver queued payloads until the process exits"""
+    # url -> (monotonic time of first buffered embed, embeds)
+    pending = {}
+    
+    while True:
+        timeout = None
+        if pending:
+            oldest = min(started for started, _ in pending.values())
+            timeout = max(0.0, oldest + BATCH_INTERVAL - time.monotonic())
+        
+        try:
+            item = _queue.get(timeout=timeout)
+        except queue.Empty:
+            item = None
+        
+        if item is not None:
+            url, payload = item['url'], item['json']
+            try:
+                if 'content' in payload or 'embeds' not in payload:
+                    # Plain text is not batched; flush anything older for
+                    # this webhook first so messages keep their order.
+                    if url in pending:
+                        _safe_flush(url, pending.pop(url)[1])
+                    _deliver(url, payload)
+                else:
+                    buffered = pending.setdefault(url, (time.monotonic(), []))[1]
+                    buffered.extend(payload['embeds'])
+                    if len(buffered) >= MAX_EMBEDS_PER_MESSAGE:
+                        _safe_flush(url, pending.pop(url)[1])
+            except Exception as e:
+                # Never let one message take the worker down
+                _dead_letter(url, payload, f"Unexpected error: {e}")
+            finally:
+                _queue.task_done()
+        
+        now = time.monotonic()
+        for url in [u for u, (started, _) in pending.items()
+                    if now - started >= BATCH_INTERVAL]:
+            _safe_flush(url, pending.pop(url)[1])
+
+
+def _safe_flush(url: str, embeds: List[Dict]):
+    """_flush, dead-lettering the embeds instead of raising"""
+    try:
+        _flush(url, embeds)
+    except Exception as e:
+        _dead_letter(url, {'embeds': embeds}, f"Unexpected error: {e}")
+
+
+def _ensure_worker():
+    """Start the delivery thread on first use, or again if it has died"""
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_run_worker,
+                name='discord-webhook',
+                daemon=True
+            )
+            _worker.start()
 
 
 class DiscordWebhook:
@@ -13,36 +279,77 @@ class DiscordWebhook:
     
     def __init__(self, webhook_url: str):
         self.webhook_url = webhook_url
+        self._enabled = bool(webhook_url)
+    
+    @staticmethod
+    def _build_payload(content: str = None, embed: Dict = None) -> Dict:
+        payload = {}
+        if content:
+            payload['content'] = content
+        if embed:
+            payload['embeds'] = [embed]
+        return payload
     
-    def send_message(self, content: str = None, embed: Dict = None) -> bool:
-        """Send a message to Discord webhook
+    def send_message(
+        self,
+        content: str = None,
+        embed: Dict = None,
+        wait: bool = False
+    ) -> bool:
+        """Queue a message for delivery to Discord webhook
+        
+        The message is posted by a background thread, so this returns
+        without waiting on Discord. Embed-only messages to the same
+        webhook are batched into a single POST.
         
         Args:
             content: Plain text message content
             embed: Rich embed object for formatting
+            wait: Try once, now, and report whether Discord accepted it.
+                Failures are not retried or dead-lettered.
             
         Returns:
-            bool: True if message sent successfully
+            bool: True if message was queued for delivery (or, with wait,
+                delivered)
         """
-        if not self.webhook_url:
+        if not self._enabled:
             return False
-            
-        payload = {}
-        if content:
-            payload['content'] = content
-        if embed:
-            payload['embeds'] = [embed]
-            
+        
+        payload = self._build_payload(content, embed)
+        if wait:
+            _, reason = _send(self.webhook_url, payload, max_attempts=1)
+            return reason is None
+        
+        _ensure_worker()
         try:
-            response = requests.post(
-                self.webhook_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
-            )
-            return response.status_code in [200, 204]
-        except Exception as e:
-            print(f"Error sending Discord webhook: {e}")
+            _queue.put_nowait({'url': self.webhook_url, 'json': payload})
+        except queue.Full:
+            print("Discord webhook queue full, dropping message")
+            return False
+        return True
+    
+    async def send_message_async(
+        self,
+        content: str = None,
+        embed: Dict = None
+    ) -> bool:
+        """Send a message to Discord webhook from async code
+        
+        Delivers directly instead of queueing, without blocking the
+        running event loop.
+        
+        Args:
+            content: Plain text message content
+            embed: Rich embed object for formatting
+            
+        Returns:
+            bool: True if message sent successfully
+        """
+        if not self._enabled:
             return False
+        
+        payload = self._build_payload(content, embed)
+        return await asyncio.to_thread(_deliver, self.webhook_url, payload)
     
     def send_drop_notification(
         self,
@@ -68,6 +375,9 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        if not self._enabled:
+            return False
+        
         embed = {
             'title': f'🎉 {item_name} Drop!',
             'color': 0x00ff00,  # Green
@@ -132,6 +442,9 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        if not self._enabled:
+            return False
+        
         embed = {
             'title': '✅ Bingo Tile Completed!',
             'description': tile_title,
@@ -177,6 +490,9 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        if not self._enabled:
+            return False
+        
         embed = {
             'title': '🎊 BINGO!',
             'description': f'{team_name} achieved a {bingo_type} bingo!',
@@ -213,9 +529,12 @@ class WebhookManager:
         Args:
             webhook_config: Dict mapping webhook names to URLs
         """
+        # Unconfigured webhooks are left out so get_webhook returns None
+        # and callers skip building notifications for them
         self.webhooks = {
             name: DiscordWebhook(url) 
             for name, url in webhook_config.items()
+            if url
         }
     
     def get_webhook(self, name: str) -> Optional[DiscordWebhook]:
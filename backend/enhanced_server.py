@@ -3,19 +3,72 @@ Enhanced BINGO Tracker Server
 Integrates Discord webhooks, Wise Old Man API, and team tracking
 """
 from flask import Flask, jsonify, Response, request, abort
+from flask.json.provider import JSONProvider
 from flask_cors import CORS, cross_origin
+import orjson
+import collections
 import json
 import datetime
 import time
 import requests
 import os
+import threading
 from typing import Dict, List, Optional
 
 # Import our custom modules
-from discord_webhook import DiscordWebhook, WebhookManager
+from discord_webhook import DiscordWebhook, WebhookManager, get_dead_letters
 from wise_old_man import WiseOldManAPI
 
+
+class Tile:
+    """A team's progress on one board tile"""
+    
+    __slots__ = ('checked', 'proof', 'curr_points', 'completed_by', 'completed_at')
+    
+    def __init__(self):
+        self.checked = False
+        self.proof = ''
+        self.curr_points = 0
+        self.completed_by = ''
+        self.completed_at = ''
+    
+    def to_dict(self) -> Dict:
+        return {
+            'checked': self.checked,
+            'proof': self.proof,
+            'currPoints': self.curr_points,
+            'completedBy': self.completed_by,
+            'completedAt': self.completed_at
+        }
+
+
+def _json_default(obj):
+    if isinstance(obj, Tile):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which encodes straight to bytes"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
+
 app = Flask(__name__, static_folder='../frontend/build')
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Configuration
@@ -35,7 +88,17 @@ wom_api = WiseOldManAPI(group_id=int(WOM_GROUP_ID) if WOM_GROUP_ID else None)
 
 # In-memory storage (replace with MongoDB/database in production)
 bingo_boards = {}
-player_drops = {}
+# board name -> RLock serializing updates to that board's tiles
+board_locks = {}
+# Guards board creation so two requests can't claim the same name
+boards_lock = threading.Lock()
+player_drops = collections.defaultdict(list)
+# Drop statistics maintained as drops are recorded
+recent_drops = collections.deque(maxlen=10)
+total_drops = 0
+drops_lock = threading.Lock()
+# board name -> team name -> {'points': int, 'completed': int}, kept in
+# step with tile updates so the leaderboard never rescans the board
 team_stats = {}
 
 # Admin keys for validation
@@ -43,6 +106,10 @@ adminTileKeys = ['description', 'image', 'points', 'title', 'rowBingo', 'colBing
 generalTileKeys = ['proof', 'checked', 'currPoints', 'completedBy', 'completedAt']
 boardCreationKeys = ['adminPassword', 'generalPassword', 'boardName', 'boardData', 'teams']
 
+# Required request fields, as sets so validation is a single difference
+BOARD_REQUIRED_KEYS = frozenset(boardCreationKeys)
+DROP_REQUIRED_KEYS = frozenset(['playerName', 'itemName'])
+
 
 def bad_request(message):
     response = jsonify({'message': message})
@@ -52,19 +119,7 @@ def bad_request(message):
 
 def init_empty_team_data(row, col):
     """Initialize empty team data structure"""
-    teamData = []
-    for i in range(row):
-        teamData.append([])
-        for j in range(col):
-            teamObj = {
-                'checked': False,
-                'proof': '',
-                'currPoints': 0,
-                'completedBy': '',
-                'completedAt': ''
-            }
-            teamData[i].append(teamObj)
-    return teamData
+    return [[Tile() for _ in range(col)] for _ in range(row)]
 
 
 @app.route('/api/health', methods=['GET'])
@@ -87,34 +142,44 @@ def create_board():
     data = request.json
     
     # Validate required fields
-    for key in boardCreationKeys:
-        if key not in data:
-            return bad_request(f"Missing required field: {key}")
+    missing = BOARD_REQUIRED_KEYS - data.keys()
+    if missing:
+        return bad_request(f"Missing required fields: {', '.join(sorted(missing))}")
     
     board_name = data['boardName']
-    if board_name in bingo_boards:
-        return bad_request("Board name already exists")
-    
-    # Initialize board
-    board = {
-        'boardName': board_name,
-        'adminPassword': data['adminPassword'],
-        'generalPassword': data['generalPassword'],
-        'boardData': data['boardData'],
-        'teams': data['teams'],
-        'teamData': {},
-        'createdAt': datetime.datetime.utcnow().isoformat(),
-        'lastUpdated': datetime.datetime.utcnow().isoformat()
-    }
-    
-    # Initialize team data for each team
-    rows = len(data['boardData'])
-    cols = len(data['boardData'][0]) if rows > 0 else 0
-    
-    for team in data['teams']:
-        board['teamData'][team['name']] = init_empty_team_data(rows, cols)
     
-    bingo_boards[board_name] = board
+    with boards_lock:
+        if board_name in bingo_boards:
+            return bad_request("Board name already exists")
+        
+        # Initialize board
+        now = datetime.datetime.utcnow().isoformat()
+        board = {
+            'boardName': board_name,
+            'adminPassword': data['adminPassword'],
+            'generalPassword': data['generalPassword'],
+            'boardData': data['boardData'],
+            'teams': data['teams'],
+            'teamData': {},
+            'createdAt': now,
+            'lastUpdated': now
+        }
+        
+        # Initialize team data for each team
+        rows = len(data['boardData'])
+        cols = len(data['boardData'][0]) if rows > 0 else 0
+        
+        for team in data['teams']:
+            board['teamData'][team['name']] = init_empty_team_data(rows, cols)
+        
+        board_locks[board_name] = threading.RLock()
+        team_stats[board_name] = {
+            team['name']: {'points': 0, 'completed': 0}
+            for team in data['teams']
+        }
+        # Publish last: tile updates look the board up without boards_lock
+        # and expect its lock and stats to exist already
+        bingo_boards[board_name] = board
     
     # Send notification
     webhook = webhook_manager.get_webhook('bingo')
@@ -148,6 +213,115 @@ def get_board(board_name):
     return jsonify(safe_board)
 
 
+def check_board_password(board, password):
+    """Return True if password matches the board's general or admin password"""
+    return password == board['generalPassword'] or password == board['adminPassword']
+
+
+def validate_tile_target(board, team_name, row, col):
+    """Return an error message if the team/tile doesn't exist, else None"""
+    if not team_name:
+        return "Team name required"
+    
+    if team_name not in board['teamData']:
+        return "Team not found"
+    
+    team_data = board['teamData'][team_name]
+    if row >= len(team_data) or col >= len(team_data[row]):
+        return "Invalid tile coordinates"
+    
+    return None
+
+
+def parse_tile_fields(data):
+    """Coerce the tile fields of an update to the types a Tile holds
+    
+    Returns:
+        (fields, error): the fields present in the update, or an error
+        message if one of them can't be converted
+    """
+    fields = {}
+    
+    if 'checked' in data:
+        checked = data['checked']
+        if isinstance(checked, str) and checked.lower() in ('true', 'false'):
+            checked = checked.lower() == 'true'
+        elif type(checked) is int and checked in (0, 1):
+            checked = bool(checked)
+        if type(checked) is not bool:
+            return None, "Invalid checked value"
+        fields['checked'] = checked
+    
+    if 'currPoints' in data:
+        points = data['currPoints']
+        # The frontend may send points as a string or a whole float
+        if isinstance(points, float) and points.is_integer():
+            points = int(points)
+        elif isinstance(points, str):
+            try:
+                points = int(points.strip())
+            except ValueError:
+                pass
+        if type(points) is not int:
+            return None, "Invalid currPoints value"
+        fields['currPoints'] = points
+    
+    for key in ('proof', 'completedBy'):
+        if key in data:
+            fields[key] = data[key]
+    
+    return fields, None
+
+
+def apply_tile_update(board_name, team_name, row, col, fields, now):
+    """Apply an update to one tile and the team's running totals
+    
+    The caller must hold the board's lock, have validated the target and
+    have parsed the update with parse_tile_fields.
+    
+    Returns:
+        Snapshot of the updated tile
+    """
+    board = bingo_boards[board_name]
+    tile = board['teamData'][team_name][row][col]
+    was_checked = tile.checked
+    old_points = tile.curr_points
+    
+    tile.checked = fields.get('checked', tile.checked)
+    tile.proof = fields.get('proof', tile.proof)
+    tile.curr_points = fields.get('currPoints', tile.curr_points)
+    tile.completed_by = fields.get('completedBy', tile.completed_by)
+    tile.completed_at = now
+    
+    board['lastUpdated'] = now
+    
+    # Apply this tile's change to the team's running totals
+    stats = team_stats[board_name][team_name]
+    if was_checked:
+        stats['completed'] -= 1
+        stats['points'] -= old_points
+    if tile.checked:
+        stats['completed'] += 1
+        stats['points'] += tile.curr_points
+    
+    # Snapshot for the response and notification, outside the lock
+    return tile.to_dict()
+
+
+def notify_tile_completion(board, team_name, row, col, tile):
+    """Queue a Discord notification for a completed tile"""
+    webhook = webhook_manager.get_webhook('bingo')
+    if webhook:
+        tile_data = board['boardData'][row][col]
+        webhook.send_tile_completion(
+            tile_title=tile_data.get('title', 'Unknown Tile'),
+            team_name=team_name,
+            player_name=tile['completedBy'],
+            points=tile['currPoints'],
+            proof_url=tile['proof']
+        )
+
+
 @app.route('/api/boards/<board_name>/tiles/<int:row>/<int:col>', methods=['PUT'])
 def update_tile(board_name, row, col):
     """Update a tile's completion status"""
@@ -164,51 +338,93 @@ def update_tile(board_name, row, col):
     board = bingo_boards[board_name]
     
     # Validate password
-    if password != board['generalPassword'] and password != board['adminPassword']:
+    if not check_board_password(board, password):
         return bad_request("Invalid password")
     
     # Update tile
-    if team_name not in board['teamData']:
-        return bad_request("Team not found")
+    error = validate_tile_target(board, team_name, row, col)
+    if error:
+        return bad_request(error)
     
-    team_data = board['teamData'][team_name]
-    if row >= len(team_data) or col >= len(team_data[row]):
-        return bad_request("Invalid tile coordinates")
+    fields, error = parse_tile_fields(data)
+    if error:
+        return bad_request(error)
     
-    tile = team_data[row][col]
-    tile['checked'] = data.get('checked', tile['checked'])
-    tile['proof'] = data.get('proof', tile['proof'])
-    tile['currPoints'] = data.get('currPoints', tile['currPoints'])
-    tile['completedBy'] = data.get('completedBy', tile.get('completedBy', ''))
-    tile['completedAt'] = datetime.datetime.utcnow().isoformat()
+    now = datetime.datetime.utcnow().isoformat()
     
-    board['lastUpdated'] = datetime.datetime.utcnow().isoformat()
+    with board_locks[board_name]:
+        tile = apply_tile_update(board_name, team_name, row, col, fields, now)
     
     # Send notification if tile was completed
     if tile['checked'] and data.get('notifyDiscord', True):
-        tile_data = board['boardData'][row][col]
-        webhook = webhook_manager.get_webhook('bingo')
-        if webhook:
-            webhook.send_tile_completion(
-                tile_title=tile_data.get('title', 'Unknown Tile'),
-                team_name=team_name,
-                player_name=tile['completedBy'],
-                points=tile['currPoints'],
-                proof_url=tile['proof']
-            )
+        notify_tile_completion(board, team_name, row, col, tile)
     
     return jsonify({'message': 'Tile updated', 'tile': tile})
 
 
+@app.route('/api/boards/<board_name>/tiles', methods=['PUT'])
+def update_tiles(board_name):
+    """Update several tiles in one request"""
+    if board_name not in bingo_boards:
+        return bad_request("Board not found")
+    
+    data = request.json
+    updates = data.get('updates')
+    
+    if not isinstance(updates, list) or not updates:
+        return bad_request("Updates required")
+    
+    board = bingo_boards[board_name]
+    
+    # Validate password once for the whole batch
+    if not check_board_password(board, data.get('password')):
+        return bad_request("Invalid password")
+    
+    # Validate and parse every update before applying any of them, so a
+    # bad entry leaves the board untouched
+    parsed = []
+    for update in updates:
+        if not isinstance(update, dict):
+            return bad_request("Invalid update")
+        row, col = update.get('row'), update.get('col')
+        if type(row) is not int or type(col) is not int or row < 0 or col < 0:
+            return bad_request("Invalid tile coordinates")
+        error = validate_tile_target(board, update.get('teamName'), row, col)
+        if error:
+            return bad_request(error)
+        fields, error = parse_tile_fields(update)
+        if error:
+            return bad_request(error)
+        parsed.append(fields)
+    
+    now = datetime.datetime.utcnow().isoformat()
+    
+    with board_locks[board_name]:
+        tiles = [
+            apply_tile_update(
+                board_name, update['teamName'], update['row'], update['col'], fields, now
+            )
+            for update, fields in zip(updates, parsed)
+        ]
+    
+    # Completions are queued together, so the webhook worker batches
+    # them into as few Discord messages as possible
+    for update, tile in zip(updates, tiles):
+        if tile['checked'] and update.get('notifyDiscord', True):
+            notify_tile_completion(board, update['teamName'], update['row'], update['col'], tile)
+    
+    return jsonify({'message': 'Tiles updated', 'tiles': tiles})
+
+
 @app.route('/api/drops', methods=['POST'])
 def record_drop():
     """Record a player's item drop"""
+    global total_drops
     data = request.json
     
-    required = ['playerName', 'itemName']
-    for field in required:
-        if field not in data:
-            return bad_request(f"Missing field: {field}")
+    missing = DROP_REQUIRED_KEYS - data.keys()
+    if missing:
+        return bad_request(f"Missing fields: {', '.join(sorted(missing))}")
     
     player_name = data['playerName']
     item_name = data['itemName']
@@ -225,10 +441,10 @@ def record_drop():
         'timestamp': datetime.datetime.utcnow().isoformat()
     }
     
-    if player_name not in player_drops:
-        player_drops[player_name] = []
-    
-    player_drops[player_name].append(drop_record)
+    with drops_lock:
+        player_drops[player_name].append(drop_record)
+        recent_drops.appendleft(drop_record)
+        total_drops += 1
     
     # Send Discord notification
     webhook = webhook_manager.get_webhook('drops')
@@ -303,25 +519,17 @@ def get_leaderboard(board_name):
         return bad_request("Board not found")
     
     board = bingo_boards[board_name]
+    board_stats = team_stats.get(board_name, {})
     leaderboard = []
     
     for team in board['teams']:
         team_name = team['name']
-        team_data = board['teamData'].get(team_name, [])
-        
-        total_points = 0
-        completed_tiles = 0
-        
-        for row in team_data:
-            for tile in row:
-                if tile['checked']:
-                    completed_tiles += 1
-                    total_points += tile['currPoints']
+        stats = board_stats.get(team_name, {'points': 0, 'completed': 0})
         
         leaderboard.append({
             'team': team_name,
-            'points': total_points,
-            'completed': completed_tiles,
+            'points': stats['points'],
+            'completed': stats['completed'],
             'color': team.get('color', '#000000')
         })
     
@@ -335,19 +543,11 @@ def get_leaderboard(board_name):
 def get_drop_stats():
     """Get drop statistics"""
     stats = {
-        'total_drops': sum(len(drops) for drops in player_drops.values()),
+        'total_drops': total_drops,
         'unique_players': len(player_drops),
-        'recent_drops': []
+        'recent_drops': list(recent_drops)
     }
     
-    # Get 10 most recent drops
-    all_drops = []
-    for player, drops in player_drops.items():
-        all_drops.extend(drops)
-    
-    all_drops.sort(key=lambda x: x['timestamp'], reverse=True)
-    stats['recent_drops'] = all_drops[:10]
-    
     return jsonify(stats)
 
 
@@ -361,8 +561,10 @@ def test_webhook():
     if not webhook:
         return bad_request(f"Webhook '{webhook_name}' not configured")
     
+    # Deliver synchronously: the point is to find out whether it arrives
     success = webhook.send_message(
-        content="✅ Test message from BINGO Tracker!"
+        content="✅ Test message from BINGO Tracker!",
+        wait=True
     )
     
     if success:
@@ -371,6 +573,26 @@ def test_webhook():
         return bad_request("Webhook test failed")
 
 
+@app.route('/api/webhook/dlq', methods=['GET'])
+def get_webhook_dead_letters():
+    """List Discord messages that could not be delivered"""
+    # Report webhooks by name; the URL embeds the webhook's token
+    names = {
+        webhook.webhook_url: name
+        for name, webhook in webhook_manager.webhooks.items()
+    }
+    
+    return jsonify([
+        {
+            'webhook': names.get(entry['url'], 'unknown'),
+            'payload': entry['payload'],
+            'reason': entry['reason'],
+            'failedAt': entry['failedAt']
+        }
+        for entry in get_dead_letters()
+    ])
+
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug_mode = os.getenv('DEBUG', 'False').lower() == 'true'
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the enhanced server
+Run with: gunicorn -c gunicorn.conf.py enhanced_server:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# Handlers spend most of their time waiting on Wise Old Man, so a threaded
+# worker lets many requests be in flight at once. Board and drop state is
+# kept in process memory, so stay on a single worker process and scale
+# with threads until a shared store is in place.
+worker_class = 'gthread'
+workers = 1
+threads = int(os.getenv('THREADS', 32))
+
+timeout = 30
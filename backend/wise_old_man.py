@@ -2,7 +2,10 @@
 Wise Old Man API Integration
 Tracks player experience, achievements, and competitions
 """
-import requests
+import threading
+import time
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 
@@ -12,6 +15,14 @@ class WiseOldManAPI:
     
     BASE_URL = "https://api.wiseoldman.net/v2"
     
+    # Upper bound on concurrent player lookups in track_players_for_tiles
+    MAX_WORKERS = 16
+    
+    # Snapshots change on the order of minutes, so player lookups are
+    # cached briefly and shared by every tile/milestone check.
+    PLAYER_CACHE_TTL = 60
+    PLAYER_CACHE_SIZE = 1024
+    
     def __init__(self, group_id: Optional[int] = None):
         """Initialize WOM API client
         
@@ -19,23 +30,58 @@ class WiseOldManAPI:
             group_id: Optional group ID for tracking clan/group
         """
         self.group_id = group_id
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'BINGOTRACKER/1.0'
-        })
+        # HTTP/2 multiplexes concurrent lookups over a single connection
+        self.session = httpx.Client(
+            http2=True,
+            base_url=self.BASE_URL,
+            headers={'User-Agent': 'BINGOTRACKER/1.0'},
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            timeout=10
+        )
+        
+        # lowercased username -> (monotonic fetch time, player data)
+        self._player_cache = {}
+        self._player_cache_lock = threading.Lock()
     
     def get_player(self, username: str) -> Optional[Dict]:
         """Get player details
         
+        Results are cached for PLAYER_CACHE_TTL seconds.
+        
         Args:
             username: Player's RuneScape username
             
         Returns:
             Player data dict or None if not found
         """
+        key = username.lower()
+        now = time.monotonic()
+        
+        with self._player_cache_lock:
+            cached = self._player_cache.get(key)
+        if cached and now - cached[0] < self.PLAYER_CACHE_TTL:
+            return cached[1]
+        
+        player = self._fetch_player(username)
+        if player is not None:
+            with self._player_cache_lock:
+                self._player_cache.pop(key, None)
+                if len(self._player_cache) >= self.PLAYER_CACHE_SIZE:
+                    # Dicts keep insertion order, so this is the oldest entry
+                    self._player_cache.pop(next(iter(self._player_cache)))
+                self._player_cache[key] = (now, player)
+        return player
+    
+    def invalidate_player(self, username: str):
+        """Drop a player's cached details"""
+        with self._player_cache_lock:
+            self._player_cache.pop(username.lower(), None)
+    
+    def _fetch_player(self, username: str) -> Optional[Dict]:
+        """Fetch player details from the API, bypassing the cache"""
         try:
             response = self.session.get(
-                f"{self.BASE_URL}/players/username/{username}"
+                f"/players/username/{username}"
             )
             if response.status_code == 200:
                 return response.json()
@@ -60,7 +106,7 @@ class WiseOldManAPI:
         """
         try:
             response = self.session.get(
-                f"{self.BASE_URL}/players/username/{username}/gained",
+                f"/players/username/{username}/gained",
                 params={'period': period}
             )
             if response.status_code == 200:
@@ -81,7 +127,7 @@ class WiseOldManAPI:
         """
         try:
             response = self.session.get(
-                f"{self.BASE_URL}/players/username/{username}/achievements"
+                f"/players/username/{username}/achievements"
             )
             if response.status_code == 200:
                 return response.json()
@@ -101,7 +147,7 @@ class WiseOldManAPI:
         
         try:
             response = self.session.get(
-                f"{self.BASE_URL}/groups/{self.group_id}"
+                f"/groups/{self.group_id}"
             )
             if response.status_code == 200:
                 data = response.json()
@@ -122,7 +168,7 @@ class WiseOldManAPI:
         """
         try:
             response = self.session.get(
-                f"{self.BASE_URL}/competitions/{competition_id}"
+                f"/competitions/{competition_id}"
             )
             if response.status_code == 200:
                 return response.json()
@@ -142,9 +188,12 @@ class WiseOldManAPI:
         """
         try:
             response = self.session.post(
-                f"{self.BASE_URL}/players/{username}"
+                f"/players/{username}"
             )
-            return response.status_code in [200, 201]
+            if response.status_code in [200, 201]:
+                self.invalidate_player(username)
+                return True
+            return False
         except Exception as e:
             print(f"Error updating player {username}: {e}")
             return False
@@ -227,8 +276,27 @@ class WiseOldManAPI:
         """
         results = {}
         
-        for username in players:
-            player_data = self.get_player(username)
+        # Normalize tile requirements once rather than per player:
+        # (tile, is_skill, metric, required_level, required_xp, required_kc)
+        requirements = []
+        for tile in tiles:
+            tile_type = tile.get('type')
+            if tile_type == 'skill':
+                requirements.append((
+                    tile, True, tile.get('skill', '').lower(),
+                    tile.get('level'), tile.get('xp'), None
+                ))
+            elif tile_type == 'boss':
+                requirements.append((
+                    tile, False, tile.get('boss', '').lower(),
+                    None, None, tile.get('kc', 0)
+                ))
+        
+        # Lookups are network-bound, so fetch all players concurrently
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            fetched = list(executor.map(self.get_player, players))
+        
+        for username, player_data in zip(players, fetched):
             if not player_data:
                 continue
             
@@ -236,32 +304,16 @@ class WiseOldManAPI:
             snapshot = player_data.get('latestSnapshot', {})
             data = snapshot.get('data', {})
             
-            for tile in tiles:
-                tile_type = tile.get('type')
+            for tile, is_skill, metric, required_level, required_xp, required_kc in requirements:
+                metric_data = data.get(metric, {})
                 
-                if tile_type == 'skill':
-                    skill = tile.get('skill', '').lower()
-                    required_level = tile.get('level')
-                    required_xp = tile.get('xp')
-                    
-                    skill_data = data.get(skill, {})
-                    level = skill_data.get('level', 0)
-                    xp = skill_data.get('experience', 0)
-                    
-                    if required_level and level >= required_level:
-                        completed_tiles.append(tile)
-                    elif required_xp and xp >= required_xp:
+                if is_skill:
+                    if required_level and metric_data.get('level', 0) >= required_level:
                         completed_tiles.append(tile)
-                
-                elif tile_type == 'boss':
-                    boss = tile.get('boss', '').lower()
-                    required_kc = tile.get('kc', 0)
-                    
-                    boss_data = data.get(boss, {})
-                    kc = boss_data.get('kills', 0)
-                    
-                    if kc >= required_kc:
+                    elif required_xp and metric_data.get('experience', 0) >= required_xp:
                         completed_tiles.append(tile)
+                elif metric_data.get('kills', 0) >= required_kc:
+                    completed_tiles.append(tile)
             
             results[username] = completed_tiles
         
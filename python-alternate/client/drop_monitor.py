@@ -2,35 +2,108 @@
 Drop Monitor Client - Watches for OSRS drops and reports to server
 Supports multiple detection methods: logfile, OCR, manual
 """
+import hashlib
 import os
+import re
 import sys
+import threading
 import time
 import argparse
 import logging
+from collections import deque
 from pathlib import Path
 from datetime import datetime
+import orjson
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Make the project root importable (for utils), once: a preloading server
+# or a re-import must not keep extending the search path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from utils.config import Config
 
 
+# Drop messages recognised in OCR output
+_OCR_RE = re.compile('Valuable drop|Untradeable|funny feeling')
+
+# Drop message formats understood by parse_drop_message
+# The item name ends at the first " (" (as RuneLite writes it); the value is
+# taken from a trailing "(... coins)" and may not be numeric, e.g. "1.2M"
+_VALUABLE_RE = re.compile(
+    r'Valuable drop: (?P<name>.+?)'
+    r'(?: \((?:.*\()?(?P<value>[^()]*) coins\)| \(.*)?\s*$'
+)
+_UNTRADEABLE_RE = re.compile(r'Untradeable drop: (?P<name>.+?)\s*$')
+_PET_RE = re.compile(r'funny feeling', re.IGNORECASE)
+
+
 class LogFileMonitor:
     """Monitor RuneLite chat logs for drop messages"""
     
+    READ_CHUNK_SIZE = 64 * 1024
+    
+    # Drops are reported in batches: the reporter waits FLUSH_INTERVAL
+    # seconds after the first drop for more to arrive, then sends up to
+    # MAX_BATCH_SIZE per request.
+    FLUSH_INTERVAL = 0.5
+    MAX_BATCH_SIZE = 32
+    
+    # Drops the server couldn't take (rate limited, down, unreachable) stay
+    # queued and are retried after an exponential backoff, or after the
+    # server's Retry-After if it sent one
+    RETRY_BASE = 1.0
+    RETRY_MAX = 60.0
+    
     def __init__(self, config, server_url):
         self.config = config
         self.server_url = server_url
         self.log_path = Path(config.get('monitoring.logfile.path', '~/.runelite/chatlogs')).expanduser()
         self.patterns = config.get('monitoring.logfile.patterns', [])
+        # One alternation scans a line for every pattern in a single pass;
+        # duplicate patterns are dropped so they aren't tried twice
+        self._matcher = (
+            re.compile('|'.join(re.escape(p) for p in dict.fromkeys(self.patterns)))
+            if self.patterns else None
+        )
         self.last_positions = {}
+        # (size, mtime) of each file when it was last read, so unchanged
+        # files can be skipped with a stat instead of an open
+        self._stats = {}
+        # Observer callbacks and housekeeping both touch last_positions
+        self._lock = threading.Lock()
         self.logger = logging.getLogger('monitor.logfile')
         
+        # One keep-alive session for all reports
+        self._session = requests.Session()
+        # Payloads are posted pre-encoded with orjson
+        self._session.headers['Content-Type'] = 'application/json'
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            # Only retry failures to connect, where the server can't have
+            # seen the request. POSTs aren't idempotent, so 429/5xx and read
+            # errors are left to the reporter's requeue and backoff.
+            max_retries=Retry(total=3, connect=3, read=0, other=0, backoff_factor=0.2)
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # Drop payloads waiting to be sent by the reporter thread
+        self._pending = deque()
+        self._pending_event = threading.Event()
+        # Cleared if the server doesn't offer the batch endpoint
+        self._batch_supported = True
+        # Consecutive failed reports, and how long to wait before the next try
+        self._failures = 0
+        self._retry_delay = 0.0
+        
     def start(self):
         """Start monitoring log files"""
         self.logger.info(f"Starting log file monitor on {self.log_path}")
@@ -39,54 +112,100 @@ class LogFileMonitor:
             self.logger.error(f"Log path does not exist: {self.log_path}")
             return
         
-        # Watch for new log files
+        reporter = threading.Thread(target=self._report_loop, name='drop-reporter', daemon=True)
+        reporter.start()
+        
+        # Catch up on existing logs once; from then on only files the
+        # observer reports as changed are read
+        self.scan_logs()
+        
         event_handler = LogFileHandler(self)
         observer = Observer()
         observer.schedule(event_handler, str(self.log_path), recursive=False)
         observer.start()
         
+        housekeeping_interval = self.config.get('monitoring.logfile.housekeeping_interval', 30)
+        
         try:
             while True:
-                # Check existing log files
-                self.scan_logs()
-                time.sleep(self.config.get('monitoring.logfile.scan_interval', 5))
+                time.sleep(housekeeping_interval)
+                self.housekeeping()
         except KeyboardInterrupt:
             observer.stop()
         
         observer.join()
+        self.flush_reports()
     
     def scan_logs(self):
         """Scan all log files for new messages"""
         for log_file in self.log_path.glob('*.txt'):
             self.process_log_file(log_file)
     
-    def process_log_file(self, log_file):
-        """Process a single log file"""
-        # Get last read position
-        last_pos = self.last_positions.get(str(log_file), 0)
-        
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                # Seek to last position
-                f.seek(last_pos)
+    def housekeeping(self):
+        """Forget deleted logs and rewind logs that were truncated or rotated"""
+        with self._lock:
+            for key, last_pos in list(self.last_positions.items()):
+                try:
+                    size = os.stat(key).st_size
+                except OSError:
+                    del self.last_positions[key]
+                    self._stats.pop(key, None)
+                    continue
                 
-                # Read new lines
-                for line in f:
-                    self.process_line(line.strip())
+                if size < last_pos:
+                    self.last_positions[key] = 0
+                    self._stats.pop(key, None)
+    
+    def process_log_file(self, log_file):
+        """Process new lines appended to a log file since the last read"""
+        key = str(log_file)
+        with self._lock:
+            # Get last read position
+            last_pos = self.last_positions.get(key, 0)
+            
+            try:
+                st = os.stat(key)
+                stat = (st.st_size, st.st_mtime_ns)
+                previous = self._stats.get(key)
+                if stat == previous:
+                    # Untouched since the last read
+                    return
+                if st.st_size < last_pos or (previous and st.st_size <= previous[0]):
+                    # Truncated, rotated or rewritten without growing: start
+                    # over from the beginning
+                    last_pos = 0
                 
-                # Update position
-                self.last_positions[str(log_file)] = f.tell()
-        
-        except Exception as e:
-            self.logger.error(f"Error processing {log_file}: {e}")
+                # Unbuffered: reads are already done in large chunks
+                with open(log_file, 'rb', buffering=0) as f:
+                    # Seek to last position
+                    f.seek(last_pos)
+                    
+                    # Read new data in large chunks, carrying any partial
+                    # line over to the next chunk
+                    tail = b''
+                    while True:
+                        chunk = f.read(self.READ_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        
+                        lines = (tail + chunk).split(b'\n')
+                        tail = lines.pop()
+                        for line in lines:
+                            self.process_line(line.decode('utf-8', 'replace').strip())
+                    
+                    # Update position, leaving an unfinished last line to be
+                    # read again once it is complete
+                    self.last_positions[key] = f.tell() - len(tail)
+                    self._stats[key] = stat
+            
+            except Exception as e:
+                self.logger.error(f"Error processing {log_file}: {e}")
     
     def process_line(self, line):
         """Process a single chat line"""
         # Check if line matches any pattern
-        for pattern in self.patterns:
-            if pattern in line:
-                self.handle_drop(line)
-                break
+        if self._matcher and self._matcher.search(line):
+            self.handle_drop(line)
     
     def handle_drop(self, message):
         """Handle detected drop message"""
@@ -110,60 +229,170 @@ class LogFileMonitor:
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        if 'Valuable drop:' in message:
-            # Extract item name and value
-            parts = message.split('Valuable drop: ')[1].split(' (')
-            drop_info['item_name'] = parts[0].strip()
-            
-            if len(parts) > 1:
-                value_str = parts[1].replace(' coins)', '').replace(',', '')
-                try:
-                    drop_info['value'] = int(value_str)
-                except ValueError:
-                    pass
+        match = _VALUABLE_RE.search(message)
+        if match:
+            drop_info['item_name'] = match['name']
+            value = (match['value'] or '').replace(',', '')
+            if value.isdecimal():
+                drop_info['value'] = int(value)
+            return drop_info
         
-        elif 'Untradeable drop:' in message:
-            drop_info['item_name'] = message.split('Untradeable drop: ')[1].strip()
+        match = _UNTRADEABLE_RE.search(message)
+        if match:
+            drop_info['item_name'] = match['name']
+            return drop_info
         
-        elif 'funny feeling' in message.lower():
+        if _PET_RE.search(message):
             drop_info['item_name'] = 'Pet drop'
             drop_info['note'] = message
+            return drop_info
         
-        return drop_info if 'item_name' in drop_info else None
+        return None
     
     def report_drop(self, drop_info):
-        """Report drop to server"""
-        try:
-            # Get player name from config or environment
-            player_name = self.config.get('monitoring.player_name', os.getenv('OSRS_USERNAME', 'Unknown'))
-            team_name = self.config.get('monitoring.team_name', '')
-            
-            payload = {
-                'playerName': player_name,
-                'itemName': drop_info['item_name'],
-                'quantity': drop_info.get('quantity', 1),
-                'value': drop_info.get('value'),
-                'teamName': team_name,
-                'timestamp': drop_info['timestamp']
-            }
+        """Queue drop to be reported to server"""
+        # Get player name from config or environment
+        player_name = self.config.get('monitoring.player_name', os.getenv('OSRS_USERNAME', 'Unknown'))
+        team_name = self.config.get('monitoring.team_name', '')
+        
+        payload = {
+            'playerName': player_name,
+            'itemName': drop_info['item_name'],
+            'quantity': drop_info.get('quantity', 1),
+            'value': drop_info.get('value'),
+            'teamName': team_name,
+            'timestamp': drop_info['timestamp']
+        }
+        
+        self._pending.append(payload)
+        self._pending_event.set()
+    
+    def _report_loop(self):
+        """Send queued drops in batches until the process exits"""
+        while True:
+            self._pending_event.wait()
+            # Give a burst of drops (e.g. a raid chest) time to arrive
+            time.sleep(self.FLUSH_INTERVAL)
+            self._pending_event.clear()
+            delay = self.flush_reports()
+            if delay:
+                # Leave the queue alone until the server is likely to
+                # accept drops again, then try it
+                time.sleep(delay)
+                self._pending_event.set()
+    
+    def flush_reports(self):
+        """Send every queued drop now
+        
+        Returns:
+            Seconds to wait before retrying if the server couldn't take the
+            drops (they stay queued), otherwise None
+        """
+        while self._pending:
+            batch = []
+            while self._pending and len(batch) < self.MAX_BATCH_SIZE:
+                batch.append(self._pending.popleft())
             
-            response = requests.post(
-                f"{self.server_url}/api/drops",
-                json=payload,
-                timeout=10
-            )
+            unsent = self._send_batch(batch)
+            if unsent:
+                self._pending.extendleft(reversed(unsent))
+                return self._retry_delay
+        
+        return None
+    
+    def _send_batch(self, batch):
+        """Report a batch of drops, one request per drop if batching is unavailable
+        
+        Returns:
+            The drops that should be retried later (empty if none)
+        """
+        if self._batch_supported:
+            try:
+                response = self._session.post(
+                    f"{self.server_url}/api/drops/batch",
+                    data=orjson.dumps({'drops': batch}),
+                    timeout=10
+                )
+            except Exception as e:
+                self.logger.error(f"Error reporting drops: {e}")
+                self._backoff()
+                return batch
             
             if response.status_code in [200, 201]:
-                self.logger.info(f"Drop reported successfully: {drop_info['item_name']}")
+                self.logger.info(f"Reported {len(batch)} drop(s) successfully")
+                self._failures = 0
+                return []
+            if self._should_retry(response):
+                self.logger.warning(f"Server could not take drops ({response.status_code}), retrying later")
+                self._backoff(response)
+                return batch
+            
+            if response.status_code == 404:
+                self.logger.info("Server has no batch endpoint, reporting drops individually")
+                self._batch_supported = False
+            elif response.status_code == 400:
+                # One bad drop fails the whole batch; don't lose the rest
+                self.logger.warning("Server rejected batch, reporting drops individually")
             else:
-                self.logger.error(f"Failed to report drop: {response.status_code}")
+                self.logger.error(f"Failed to report drops: {response.status_code}")
+                return []
         
+        for i, payload in enumerate(batch):
+            if not self._send_drop(payload):
+                return batch[i:]
+        return []
+    
+    def _send_drop(self, payload):
+        """Report a single drop to server
+        
+        Returns:
+            bool: False if the drop should be retried later
+        """
+        try:
+            response = self._session.post(
+                f"{self.server_url}/api/drops",
+                data=orjson.dumps(payload),
+                timeout=10
+            )
         except Exception as e:
             self.logger.error(f"Error reporting drop: {e}")
+            self._backoff()
+            return False
+        
+        if response.status_code in [200, 201]:
+            self.logger.info(f"Drop reported successfully: {payload['itemName']}")
+            self._failures = 0
+        elif self._should_retry(response):
+            self.logger.warning(f"Server could not take drop ({response.status_code}), retrying later")
+            self._backoff(response)
+            return False
+        else:
+            self.logger.error(f"Failed to report drop: {response.status_code}")
+        
+        return True
+    
+    @staticmethod
+    def _should_retry(response):
+        """Whether a failed report may succeed if sent again later"""
+        return response.status_code == 429 or response.status_code >= 500
+    
+    def _backoff(self, response=None):
+        """Set the delay before the next report after a failure"""
+        self._failures += 1
+        delay = min(self.RETRY_MAX, self.RETRY_BASE * 2 ** (self._failures - 1))
+        
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = min(self.RETRY_MAX, float(retry_after))
+            except ValueError:
+                pass
+        
+        self._retry_delay = delay
 
 
 class LogFileHandler(FileSystemEventHandler):
-    """Watch for new log files"""
+    """Read log files as they are created or appended to"""
     
     def __init__(self, monitor):
         self.monitor = monitor
@@ -193,6 +422,19 @@ class OCRMonitor:
         except ImportError:
             self.logger.error("OCR monitoring requires: pip install pytesseract Pillow")
             sys.exit(1)
+        
+        # Digest of the last capture that was OCR'd
+        self._last_hash = None
+        
+        # The capture is a single block of chat text, so skip Tesseract's
+        # page layout analysis (--psm 6) and only allow characters that occur
+        # in drop messages. pytesseract shlex-splits this string, hence the
+        # escaped apostrophe; spaces between words are kept regardless.
+        self._tess_cfg = (
+            '--oem 1 --psm 6 -l eng -c tessedit_char_whitelist='
+            'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+            ",.:()!\\'-/"
+        )
     
     def start(self):
         """Start OCR monitoring"""
@@ -203,14 +445,20 @@ class OCRMonitor:
         
         try:
             while True:
-                # Capture screen region
-                screenshot = self.ImageGrab.grab(bbox=tuple(region))
-                
-                # Run OCR
-                text = self.pytesseract.image_to_string(screenshot)
+                # Capture screen region; Tesseract reads grayscale at least
+                # as well as colour, and it halves the bytes to hash
+                screenshot = self.ImageGrab.grab(bbox=tuple(region)).convert('L')
                 
-                # Process text for drops
-                self.process_text(text)
+                # Only run OCR when the chat area has changed since last time
+                frame_hash = hashlib.blake2b(screenshot.tobytes(), digest_size=8).digest()
+                if frame_hash != self._last_hash:
+                    self._last_hash = frame_hash
+                    
+                    # Run OCR
+                    text = self.pytesseract.image_to_string(screenshot, config=self._tess_cfg)
+                    
+                    # Process text for drops
+                    self.process_text(text)
                 
                 time.sleep(scan_interval)
         
@@ -219,10 +467,13 @@ class OCRMonitor:
     
     def process_text(self, text):
         """Process OCR text for drop messages"""
-        lines = text.split('\n')
+        # Most captures contain no drop at all; rule that out with one scan
+        # of the whole text before looking at individual lines
+        if not _OCR_RE.search(text):
+            return
         
-        for line in lines:
-            if any(pattern in line for pattern in ['Valuable drop', 'Untradeable', 'funny feeling']):
+        for line in text.splitlines():
+            if _OCR_RE.search(line):
                 self.logger.info(f"OCR detected: {line}")
                 # Parse and report similar to log file monitor
                 # Implementation similar to LogFileMonitor.process_line()
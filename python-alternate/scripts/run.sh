@@ -0,0 +1,19 @@
+#!/usr/bin/env sh
+# Production entrypoint: create any missing tables, then serve the app with
+# gunicorn. Threaded workers keep one slow request (e.g. a Discord webhook)
+# from blocking the others.
+set -e
+
+# Run from the project root so config.yaml resolves; app.py imports its
+# sibling modules (models, api) directly, hence --pythonpath server
+cd "$(dirname "$0")/.."
+
+python server/app.py
+
+exec gunicorn \
+    --workers "${WORKERS:-4}" \
+    --worker-class gthread \
+    --threads "${THREADS:-8}" \
+    --bind "${HOST:-0.0.0.0}:${PORT:-8000}" \
+    --pythonpath server \
+    app:app
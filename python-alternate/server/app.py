@@ -2,18 +2,28 @@
 Main Flask Application for Python-Only BINGO Tracker
 Combines web interface with API functionality
 """
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session, flash
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+import orjson
 import yaml
 import os
 import sys
+import queue
+import threading
+import time
 from datetime import datetime
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.engine import make_url
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Make the project root importable (for utils), once: a preloading server
+# or a re-import must not keep extending the search path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from utils.database import Database, init_db
 from utils.discord_webhook import WebhookManager
@@ -22,8 +32,31 @@ from utils.config import Config
 import models
 import api
 
+# Naive datetimes are UTC here; non-str keys are stringified like the
+# stdlib provider does
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which encodes straight to bytes"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Load configuration
 config = Config('config.yaml')
@@ -47,6 +80,44 @@ db = Database(app)
 webhook_manager = WebhookManager(config.get('discord.webhooks', {}))
 wom_api = WiseOldManAPI(config.get('wiseoldman.group_id'))
 
+# Discord notifications are queued as (webhook name, message) pairs and
+# sent by a background thread, so a page load doesn't wait on (or fail
+# because of) Discord. Messages that pile up during a burst go out together.
+WEBHOOK_BATCH_SIZE = 10
+_webhook_queue = queue.Queue()
+
+
+def _webhook_worker():
+    """Drain the webhook queue, batching messages per webhook"""
+    while True:
+        items = [_webhook_queue.get()]
+        while len(items) < WEBHOOK_BATCH_SIZE:
+            try:
+                items.append(_webhook_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        by_webhook = {}
+        for name, message in items:
+            by_webhook.setdefault(name, []).append(message)
+        
+        for name, messages in by_webhook.items():
+            webhook = webhook_manager.get_webhook(name)
+            if webhook:
+                try:
+                    webhook.send_batch(messages)
+                except Exception as e:
+                    print(f"Error sending Discord webhook: {e}")
+
+
+threading.Thread(target=_webhook_worker, name='webhook-worker', daemon=True).start()
+
+# None of these change while the app is running, so /health (polled by
+# uptime checks every few seconds) reports them without touching the engine
+_DB_NAME = make_url(app.config['SQLALCHEMY_DATABASE_URI']).database
+_DISCORD_ENABLED = bool(webhook_manager.webhooks)
+_WOM_ENABLED = bool(wom_api.group_id)
+
 # Register API blueprint
 app.register_blueprint(api.api_bp, url_prefix='/api')
 
@@ -55,6 +126,41 @@ def load_user(user_id):
     return models.User.query.get(int(user_id))
 
 
+def count_rows(column, *criteria):
+    """COUNT(column) as a plain aggregate, without Query.count()'s subquery"""
+    query = db.session.query(func.count(column))
+    if criteria:
+        query = query.filter(*criteria)
+    return query.scalar()
+
+
+# Site-wide counts scan whole tables (COUNT(DISTINCT) on drops in
+# particular) and don't need to be exact to the second, so pages share a
+# copy that is recomputed at most every STATS_TTL seconds.
+STATS_TTL = 30
+_stats_cache = {'value': None, 'ts': 0.0}
+
+
+def site_stats():
+    """Board, team, drop and player counts, cached for STATS_TTL seconds"""
+    now = time.monotonic()
+    if _stats_cache['value'] is None or now - _stats_cache['ts'] >= STATS_TTL:
+        _stats_cache['value'] = {
+            'total_boards': count_rows(models.Board.id),
+            'active_boards': count_rows(models.Board.id, models.Board.is_active == True),
+            'total_teams': count_rows(models.Team.id),
+            'total_drops': count_rows(models.Drop.id),
+            'unique_players': count_rows(func.distinct(models.Drop.player_name))
+        }
+        _stats_cache['ts'] = now
+    return _stats_cache['value']
+
+
+def invalidate_site_stats():
+    """Make the next site_stats() call recount, e.g. after a write"""
+    _stats_cache['value'] = None
+
+
 # ===== Web Routes =====
 
 @app.route('/')
@@ -63,11 +169,12 @@ def index():
     boards = models.Board.query.order_by(models.Board.created_at.desc()).limit(10).all()
     recent_drops = models.Drop.query.order_by(models.Drop.timestamp.desc()).limit(5).all()
     
+    counts = site_stats()
     stats = {
-        'total_boards': models.Board.query.count(),
-        'total_teams': models.Team.query.count(),
-        'total_drops': models.Drop.query.count(),
-        'active_players': db.session.query(models.Drop.player_name).distinct().count()
+        'total_boards': counts['total_boards'],
+        'total_teams': counts['total_teams'],
+        'total_drops': counts['total_drops'],
+        'active_players': counts['unique_players']
     }
     
     return render_template('index.html', 
@@ -88,11 +195,15 @@ def dashboard():
     boards = models.Board.query.all()
     
     # Calculate statistics
+    counts = site_stats()
     stats = {
-        'total_drops': models.Drop.query.count(),
-        'unique_players': db.session.query(models.Drop.player_name).distinct().count(),
-        'active_boards': len([b for b in boards if b.is_active]),
-        'total_points': sum([team.total_points for board in boards for team in board.teams])
+        'total_drops': counts['total_drops'],
+        'unique_players': counts['unique_players'],
+        'active_boards': sum(1 for b in boards if b.is_active),
+        # Summed in SQL rather than lazy-loading every board's teams
+        'total_points': db.session.query(
+            func.coalesce(func.sum(models.Team.total_points), 0)
+        ).join(models.Team.board).scalar()
     }
     
     return render_template('dashboard.html',
@@ -113,7 +224,7 @@ def view_board(board_name):
     # Calculate team standings
     leaderboard = []
     for team in board.teams:
-        completed = len([t for t in team.tiles if t.checked])
+        completed = sum(1 for t in team.tiles if t.checked)
         leaderboard.append({
             'name': team.name,
             'color': team.color,
@@ -202,14 +313,14 @@ def create_board():
             db.session.add(team)
         
         db.session.commit()
+        invalidate_site_stats()
         
         # Send Discord notification
-        webhook = webhook_manager.get_webhook('bingo')
-        if webhook:
-            webhook.send_message(
-                content=f"🎮 New Bingo Board Created: **{board.name}**\n"
-                       f"Teams: {', '.join([t.name for t in board.teams])}"
-            )
+        if webhook_manager.get_webhook('bingo'):
+            _webhook_queue.put(('bingo', {
+                'content': f"🎮 New Bingo Board Created: **{board.name}**\n"
+                           f"Teams: {', '.join([t.name for t in board.teams])}"
+            }))
         
         flash(f'Board "{board.name}" created successfully!', 'success')
         return redirect(url_for('view_board', board_name=board.name))
@@ -220,35 +331,77 @@ def create_board():
 @app.route('/leaderboard')
 def leaderboard():
     """Global leaderboard across all boards"""
-    boards = models.Board.query.filter_by(is_active=True).all()
-    
-    all_teams = []
-    for board in boards:
-        for team in board.teams:
-            completed = len([t for t in team.tiles if t.checked])
-            all_teams.append({
-                'name': team.name,
-                'board': board.name,
-                'color': team.color,
-                'points': team.total_points,
-                'completed': completed
-            })
+    # One grouped query instead of lazy-loading each board's teams and
+    # each team's tiles
+    rows = db.session.query(
+        models.Team.name,
+        models.Team.color,
+        models.Team.total_points,
+        models.Board.name.label('board'),
+        func.coalesce(func.sum(case((models.Tile.checked, 1), else_=0)), 0).label('completed')
+    ).join(models.Team.board).outerjoin(models.Team.tiles).filter(
+        models.Board.is_active == True
+    ).group_by(
+        models.Team.id,
+        models.Team.name,
+        models.Team.color,
+        models.Team.total_points,
+        models.Board.id,
+        models.Board.name
+    ).order_by(
+        models.Team.total_points.desc()
+    ).all()
     
-    all_teams.sort(key=lambda x: x['points'], reverse=True)
+    all_teams = [
+        {
+            'name': row.name,
+            'board': row.board,
+            'color': row.color,
+            'points': row.total_points,
+            'completed': row.completed
+        }
+        for row in rows
+    ]
     
     return render_template('leaderboard.html', teams=all_teams)
 
 
+def parse_drops_cursor(value):
+    """Parse a /drops cursor of the form '<iso timestamp>_<drop id>'"""
+    timestamp, _, drop_id = value.rpartition('_')
+    return datetime.fromisoformat(timestamp), int(drop_id)
+
+
 @app.route('/drops')
 def drops():
     """View all drops"""
-    page = request.args.get('page', 1, type=int)
     per_page = 50
     
-    drops_query = models.Drop.query.order_by(models.Drop.timestamp.desc())
-    drops_page = drops_query.paginate(page=page, per_page=per_page)
+    # Keyset pagination: each page starts below the last (timestamp, id) of
+    # the previous one, so deep pages don't scan every row before them as an
+    # OFFSET would. The id breaks ties between drops with equal timestamps.
+    before = request.args.get('before', type=parse_drops_cursor)
+    
+    drops_query = models.Drop.query.order_by(
+        models.Drop.timestamp.desc(),
+        models.Drop.id.desc()
+    )
+    if before:
+        before_ts, before_id = before
+        drops_query = drops_query.filter(or_(
+            models.Drop.timestamp < before_ts,
+            and_(models.Drop.timestamp == before_ts, models.Drop.id < before_id)
+        ))
     
-    return render_template('drops.html', drops=drops_page)
+    # Fetch one extra row to learn whether there is a next page
+    drops_list = drops_query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(drops_list) > per_page:
+        drops_list = drops_list[:per_page]
+        last_drop = drops_list[-1]
+        next_cursor = f'{last_drop.timestamp.isoformat()}_{last_drop.id}'
+    
+    return render_template('drops.html', drops=drops_list, next_cursor=next_cursor)
 
 
 @app.route('/report', methods=['GET', 'POST'])
@@ -271,19 +424,22 @@ def report_drop():
         
         db.session.add(drop)
         db.session.commit()
+        invalidate_site_stats()
         
         # Send notifications
         webhook = webhook_manager.get_webhook('drops')
         if webhook:
-            webhook.send_drop_notification(
-                player_name=drop.player_name,
-                item_name=drop.item_name,
-                item_quantity=drop.quantity,
-                rarity=drop.rarity,
-                value=drop.value,
-                screenshot_url=drop.screenshot_url,
-                team_name=drop.team_name
-            )
+            _webhook_queue.put(('drops', {
+                'embed': webhook.build_drop_embed(
+                    player_name=drop.player_name,
+                    item_name=drop.item_name,
+                    item_quantity=drop.quantity,
+                    rarity=drop.rarity,
+                    value=drop.value,
+                    screenshot_url=drop.screenshot_url,
+                    team_name=drop.team_name
+                )
+            }))
         
         flash('Drop reported successfully!', 'success')
         return redirect(url_for('drops'))
@@ -294,17 +450,59 @@ def report_drop():
     return render_template('report_drop.html', teams=teams)
 
 
+@app.route('/api/drops/batch', methods=['POST'])
+@limiter.limit(config.get('security.rate_limit.batch', '10 per minute'))
+def report_drops_batch():
+    """Record a batch of drops from the drop monitor in one transaction"""
+    data = request.get_json(silent=True) or {}
+    drops = data.get('drops')
+    
+    if not isinstance(drops, list) or not drops:
+        return jsonify({'error': 'Expected a non-empty "drops" list'}), 400
+    if not all(isinstance(d, dict) and d.get('playerName') and d.get('itemName') for d in drops):
+        return jsonify({'error': 'Each drop needs playerName and itemName'}), 400
+    
+    try:
+        rows = [
+            {
+                'player_name': d['playerName'],
+                'item_name': d['itemName'],
+                'quantity': int(d.get('quantity') or 1),
+                'rarity': d.get('rarity'),
+                'value': int(d['value']) if d.get('value') else None,
+                'team_name': d.get('teamName') or None,
+                'screenshot_url': d.get('screenshot'),
+                'timestamp': (
+                    datetime.fromisoformat(d['timestamp'])
+                    if d.get('timestamp') else datetime.utcnow()
+                )
+            }
+            for d in drops
+        ]
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid drop: {e}'}), 400
+    
+    # One multi-row INSERT and a single commit for the whole batch
+    db.session.bulk_insert_mappings(models.Drop, rows)
+    db.session.commit()
+    invalidate_site_stats()
+    
+    # One summary notification instead of one per drop
+    if webhook_manager.get_webhook('drops'):
+        players = {row['player_name'] for row in rows}
+        source = f"**{next(iter(players))}**" if len(players) == 1 else f"{len(players)} players"
+        _webhook_queue.put(('drops', {
+            'content': f"📦 Batch: {len(rows)} drops from {source}"
+        }))
+    
+    return jsonify({'success': True, 'count': len(rows)}), 201
+
+
 @app.route('/stats')
 def stats():
     """Statistics page"""
     # Overall stats
-    overall = {
-        'total_boards': models.Board.query.count(),
-        'active_boards': models.Board.query.filter_by(is_active=True).count(),
-        'total_teams': models.Team.query.count(),
-        'total_drops': models.Drop.query.count(),
-        'unique_players': db.session.query(models.Drop.player_name).distinct().count()
-    }
+    overall = dict(site_stats())
     
     # Top players by drops
     top_players = db.session.query(
@@ -329,17 +527,18 @@ def stats():
 
 
 @app.route('/health')
+@limiter.exempt
 def health():
     """Health check endpoint"""
-    return jsonify({
+    return Response(orjson.dumps({
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'services': {
-            'database': db.engine.url.database,
-            'discord': bool(webhook_manager.webhooks),
-            'wom': bool(wom_api.group_id)
+            'database': _DB_NAME,
+            'discord': _DISCORD_ENABLED,
+            'wom': _WOM_ENABLED
         }
-    })
+    }), mimetype='application/json')
 
 
 # Error handlers
@@ -355,13 +554,7 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    # Initialize database
+    # Initialize database. The app itself is served by gunicorn, see
+    # scripts/run.sh
     with app.app_context():
         init_db(db)
-    
-    # Run app
-    app.run(
-        host=config.get('server.host', '0.0.0.0'),
-        port=config.get('server.port', 8000),
-        debug=config.get('server.debug', False)
-    )
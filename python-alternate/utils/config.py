@@ -6,6 +6,16 @@ import os
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+# libyaml's C parser when PyYAML was built with it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
+
+# Marks keys known to be absent in Config's lookup cache
+_MISSING = object()
+
 
 class Config:
     """Configuration manager"""
@@ -13,6 +23,8 @@ class Config:
     def __init__(self, config_file: str = 'config.yaml'):
         self.config_file = Path(config_file)
         self.config = self.load_config()
+        # Resolved dot-notation lookups, cleared on reload
+        self._cache: Dict[str, Any] = {}
     
     def load_config(self) -> Dict:
         """Load configuration from YAML file"""
@@ -20,7 +32,7 @@ class Config:
             raise FileNotFoundError(f"Config file not found: {self.config_file}")
         
         with open(self.config_file, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YAMLLoader)
         
         # Override with environment variables
         self._apply_env_overrides(config)
@@ -30,26 +42,33 @@ class Config:
     def _apply_env_overrides(self, config: Dict):
         """Apply environment variable overrides"""
         # Server
-        if os.getenv('SERVER_PORT'):
-            config['server']['port'] = int(os.getenv('SERVER_PORT'))
-        if os.getenv('SECRET_KEY'):
-            config['server']['secret_key'] = os.getenv('SECRET_KEY')
+        value = os.getenv('SERVER_PORT')
+        if value:
+            config['server']['port'] = int(value)
+        value = os.getenv('SECRET_KEY')
+        if value:
+            config['server']['secret_key'] = value
         
         # Database
-        if os.getenv('DATABASE_URL'):
-            config['database']['url'] = os.getenv('DATABASE_URL')
+        value = os.getenv('DATABASE_URL')
+        if value:
+            config['database']['url'] = value
         
         # Discord
-        if os.getenv('DISCORD_WEBHOOK_MAIN'):
-            config['discord']['webhooks']['main'] = os.getenv('DISCORD_WEBHOOK_MAIN')
-        if os.getenv('DISCORD_WEBHOOK_DROPS'):
-            config['discord']['webhooks']['drops'] = os.getenv('DISCORD_WEBHOOK_DROPS')
-        if os.getenv('DISCORD_WEBHOOK_BINGO'):
-            config['discord']['webhooks']['bingo'] = os.getenv('DISCORD_WEBHOOK_BINGO')
+        value = os.getenv('DISCORD_WEBHOOK_MAIN')
+        if value:
+            config['discord']['webhooks']['main'] = value
+        value = os.getenv('DISCORD_WEBHOOK_DROPS')
+        if value:
+            config['discord']['webhooks']['drops'] = value
+        value = os.getenv('DISCORD_WEBHOOK_BINGO')
+        if value:
+            config['discord']['webhooks']['bingo'] = value
         
         # WOM
-        if os.getenv('WOM_GROUP_ID'):
-            config['wiseoldman']['group_id'] = int(os.getenv('WOM_GROUP_ID'))
+        value = os.getenv('WOM_GROUP_ID')
+        if value:
+            config['wiseoldman']['group_id'] = int(value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by dot-notation key
@@ -61,14 +80,23 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
+        try:
+            value = self._cache[key]
+        except KeyError:
+            value = self._resolve(key)
+            self._cache[key] = value
+        
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key: str) -> Any:
+        """Walk the config for a dot-notation key"""
         value = self.config
         
-        for k in keys:
+        for k in key.split('.'):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
-                return default
+                return _MISSING
         
         return value
     
@@ -87,4 +115,5 @@ class Config:
     
     def reload(self):
         """Reload configuration from file"""
+        self._cache.clear()
         self.config = self.load_config()
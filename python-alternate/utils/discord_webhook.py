@@ -2,17 +2,26 @@
 Discord Webhook Integration Module
 Sends notifications about bingo tile completions and item drops
 """
+import orjson
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Dict, List, Optional
 
+# Discord's limits for a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_CONTENT_LENGTH = 2000
+
 
 class DiscordWebhook:
     """Handle Discord webhook notifications for bingo tracker"""
     
-    def __init__(self, webhook_url: str):
+    def __init__(self, webhook_url: str, session: Optional[requests.Session] = None):
         self.webhook_url = webhook_url
+        # Keep-alive: repeated sends reuse the TLS connection to Discord
+        self.session = session or requests.Session()
     
     def send_message(self, content: str = None, embed: Dict = None) -> bool:
         """Send a message to Discord webhook
@@ -24,20 +33,56 @@ class DiscordWebhook:
         Returns:
             bool: True if message sent successfully
         """
-        if not self.webhook_url:
-            return False
-            
         payload = {}
         if content:
             payload['content'] = content
         if embed:
             payload['embeds'] = [embed]
             
+        return self._post(payload)
+    
+    def send_batch(self, messages: List[Dict]) -> bool:
+        """Send several messages in as few webhook calls as possible
+        
+        Contents are joined into shared messages and embeds are grouped
+        MAX_EMBEDS_PER_MESSAGE at a time.
+        
+        Args:
+            messages: Dicts with a 'content' string and/or an 'embed' object,
+                as would be passed to send_message
+            
+        Returns:
+            bool: True if every message sent successfully
+        """
+        contents = [m['content'] for m in messages if m.get('content')]
+        embeds = [m['embed'] for m in messages if m.get('embed')]
+        success = True
+        
+        batch = []
+        for content in contents:
+            if batch and len('\n\n'.join(batch + [content])) > MAX_CONTENT_LENGTH:
+                success = self._post({'content': '\n\n'.join(batch)}) and success
+                batch = []
+            batch.append(content)
+        if batch:
+            success = self._post({'content': '\n\n'.join(batch)}) and success
+        
+        for i in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+            success = self._post({'embeds': embeds[i:i + MAX_EMBEDS_PER_MESSAGE]}) and success
+        
+        return success
+    
+    def _post(self, payload: Dict) -> bool:
+        """POST a raw payload to the webhook"""
+        if not self.webhook_url:
+            return False
+            
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
+                data=orjson.dumps(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=10
             )
             return response.status_code in [200, 204]
         except Exception as e:
@@ -68,6 +113,22 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        return self.send_message(embed=self.build_drop_embed(
+            player_name, item_name, item_quantity, rarity, value,
+            screenshot_url, team_name
+        ))
+    
+    @staticmethod
+    def build_drop_embed(
+        player_name: str,
+        item_name: str,
+        item_quantity: int = 1,
+        rarity: str = None,
+        value: int = None,
+        screenshot_url: str = None,
+        team_name: str = None
+    ) -> Dict:
+        """Build the embed for an item drop (see send_drop_notification)"""
         embed = {
             'title': f'🎉 {item_name} Drop!',
             'color': 0x00ff00,  # Green
@@ -110,7 +171,7 @@ class DiscordWebhook:
         if screenshot_url:
             embed['image'] = {'url': screenshot_url}
         
-        return self.send_message(embed=embed)
+        return embed
     
     def send_tile_completion(
         self,
@@ -132,6 +193,19 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        return self.send_message(embed=self.build_tile_embed(
+            tile_title, team_name, player_name, points, proof_url
+        ))
+    
+    @staticmethod
+    def build_tile_embed(
+        tile_title: str,
+        team_name: str,
+        player_name: str,
+        points: int,
+        proof_url: str = None
+    ) -> Dict:
+        """Build the embed for a tile completion (see send_tile_completion)"""
         embed = {
             'title': '✅ Bingo Tile Completed!',
             'description': tile_title,
@@ -159,7 +233,7 @@ class DiscordWebhook:
         if proof_url:
             embed['thumbnail'] = {'url': proof_url}
         
-        return self.send_message(embed=embed)
+        return embed
     
     def send_bingo_achieved(
         self,
@@ -177,6 +251,13 @@ class DiscordWebhook:
         Returns:
             bool: Success status
         """
+        return self.send_message(embed=self.build_bingo_embed(
+            team_name, bingo_type, total_points
+        ))
+    
+    @staticmethod
+    def build_bingo_embed(team_name: str, bingo_type: str, total_points: int) -> Dict:
+        """Build the embed for a bingo (see send_bingo_achieved)"""
         embed = {
             'title': '🎊 BINGO!',
             'description': f'{team_name} achieved a {bingo_type} bingo!',
@@ -201,7 +282,7 @@ class DiscordWebhook:
             ]
         }
         
-        return self.send_message(embed=embed)
+        return embed
 
 
 class WebhookManager:
@@ -213,8 +294,25 @@ class WebhookManager:
         Args:
             webhook_config: Dict mapping webhook names to URLs
         """
+        # All webhooks post to Discord, so they share one connection pool.
+        # Rate limits and gateway errors are retried, honouring Retry-After.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503],
+                allowed_methods=None,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         self.webhooks = {
-            name: DiscordWebhook(url) 
+            name: DiscordWebhook(url, self.session)
             for name, url in webhook_config.items()
         }
     